@@ -0,0 +1,288 @@
+# handlers.py
+# Questionnaire flow and admin commands
+import asyncio
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from aiogram import BaseMiddleware, Bot, Router, F
+from aiogram.types import Message, CallbackQuery
+from aiogram.filters import CommandStart, Command, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+
+from config import MAIN_ADMIN, JOB_TYPES
+from keyboards import (ChoiceCB, JOB_Q, EDU_Q, MARITAL_Q, RUSSIAN_Q, YESNO_Q,
+                       EDUCATION_OPTIONS, MARITAL_OPTIONS, RUSSIAN_OPTIONS, YESNO_OPTIONS,
+                       EDUCATION_KB, MARITAL_KB, RUSSIAN_KB, YESNO_KB, JOBS_KB, PHONE_KB, REMOVE_KB)
+from states import Form
+from storage import get_media, update_media, get_admins, is_admin, add_admin, remove_admin
+from validators import valid_date
+
+router = Router()
+
+class MediaMiddleware(BaseMiddleware):
+    """Passes the in-memory media prompts to handlers as `media`."""
+
+    async def __call__(self, handler, event, data):
+        data["media"] = get_media()
+        return await handler(event, data)
+
+# Inner middlewares only run once a handler has matched
+router.message.middleware(MediaMiddleware())
+router.callback_query.middleware(MediaMiddleware())
+
+# Answers live in FSM data (one top-level key each), so they are kept by whatever
+# storage the dispatcher uses, e.g. Redis across restarts; finish_form puts them
+# back in order.
+async def push_answer(state: FSMContext, key: str, value: Any) -> None:
+    await state.update_data({key: value})
+
+# Pending fire-and-forget sends; holding a reference keeps them from being GC'd mid-flight
+_BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+def _task_done(task: asyncio.Task) -> None:
+    _BACKGROUND_TASKS.discard(task)
+    # Retrieve the result so failed sends are ignored quietly, like the awaited ones
+    if not task.cancelled():
+        task.exception()
+
+def fire_and_forget(coro) -> None:
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_task_done)
+
+# ------- Question table -------
+# Each step is stored under `key`, asked with `prompt` (+ `kb`), and answered with
+# text, an inline choice, a voice or a video. Choice steps map the index of a
+# pressed ChoiceCB button carrying their `choice` code back into `options`.
+# Voice/video steps send the `media` prompt from media.json instead of the text
+# when one is configured.
+class Step(NamedTuple):
+    state: State
+    key: str
+    prompt: str
+    kb: Any = None
+    accepts: str = "text"
+    validator: Optional[Callable[[str], bool]] = None
+    error: Optional[str] = None
+    media: Optional[str] = None
+    options: Optional[List[str]] = None
+    choice: Optional[str] = None
+
+QUESTIONS: List[Step] = [
+    Step(Form.ChooseJob, "Ish turi", "Quyidagi tugmalardan birini tanlang (ish turi):", JOBS_KB,
+         accepts="choice", options=JOB_TYPES, choice=JOB_Q),
+    Step(Form.AskName, "Ism-familiya", "Ism-familyangizni yozing:"),
+    Step(Form.AskPhone, "Telefon raqami", "Telefon raqamingizni yozing:\nMisol: +998909998877", PHONE_KB),
+    Step(Form.AskAddress, "Manzil (propiska)", "Doimiy yashash manzilingizni yozing (propiska):", REMOVE_KB),
+    Step(Form.AskBirthday, "Tug'ilgan sana", "O'z tug'ilgan kuningizni 01.01.2000 formatda yozing:",
+         validator=valid_date, error="Tug'ilgan kuningizni 01.01.2000 formatda yozing."),
+    Step(Form.AskEducation, "Ma'lumoti", "Ma'lumotingiz:", EDUCATION_KB,
+         accepts="choice", options=EDUCATION_OPTIONS, choice=EDU_Q),
+    Step(Form.AskExperience, "Ish tajribasi", "Oldin qaysi korxonalarda va qaysi lavozimda ishlagansiz?\nMisol:\n1. Perfect Consulting Group - Sotuv menejeri\n2. Alora - sotuvchi\n3. Ishlamaganman"),
+    Step(Form.AskMarital, "Oilaviy holat", "Oila qurganmisiz?", MARITAL_KB,
+         accepts="choice", options=MARITAL_OPTIONS, choice=MARITAL_Q),
+    Step(Form.WaitVoiceAnswer, "Ovozli javob (file_id)", "Iltimos, savolga OVOZ xabari bilan javob yuboring.",
+         accepts="voice", media="voice_prompt_file_id"),
+    Step(Form.AskRussian, "Rus tili darajasi", "Rus tilini qay darajada bilasiz:", RUSSIAN_KB,
+         accepts="choice", options=RUSSIAN_OPTIONS, choice=RUSSIAN_Q),
+    Step(Form.WaitVideoAnswer, "Video javob (file_id)", "Iltimos, VIDEOLI xabar yuboring (video yoki video-note).",
+         accepts="video", media="russian_video_prompt_file_id"),
+    Step(Form.AskConsent, "Surishtirish roziligi", "Oxirgi ish joyingizdan siz haqingizda surishtirishimizga rozimisiz?", YESNO_KB,
+         accepts="choice", options=YESNO_OPTIONS, choice=YESNO_Q),
+    Step(Form.AskReference, "Tavsiyanoma beruvchi", "Oxirgi ish joyingizdan kim sizga tavsiya xati bera oladi, nomi, ishlash joyi, lavozimi, telefon raqami:\nMisol: Direktor - Malika Akramovna - Nona collection - +998909998877"),
+    Step(Form.AskDuration, "Qancha muddat ishlamoqchi", "Bizning korxonada qancha muddat ishlamoqchisiz?"),
+    Step(Form.AskOvertime, "Ishdan keyin qolishga rozilik", "Korxonada ishdan keyin xam qolib ishlash kerak bo‘lib qolsa ishlaysizmi?"),
+    Step(Form.AskHealth, "Sog'liq holati", "Sog‘ligingizda muammo yo‘qmi?"),
+    Step(Form.AskWhyLate, "Nega kech kelishadi", "Nima uchun ayrim odamlar ishga kech kelishadi?"),
+    Step(Form.AskWhySteal, "Nega o'g'rilik qilishadi", "Nima uchun ayrim insonlar o'g'rilik qilishadi?"),
+    Step(Form.AskWhyGoodBad, "Yaxshi-yomon ish sababi", "Nima uchun ayrim ishchilar yaxshi ishlashadi, ayrimlari yomon? Bunga sabab nima?"),
+    Step(Form.AskPrevSalary, "Oldingi maosh", "Oldingi ishxonangizda qancha maoshga ishlgansiz?"),
+    Step(Form.AskDesiredSalary, "Kutilgan maosh", "Bizning ishxonamizda qancha maoshga ishlamoqchisiz?"),
+    Step(Form.AskCourses, "Kurslar", "Qanday kurslarda o’qigansiz?"),
+]
+STEPS: Dict[str, Step] = {step.state.state: step for step in QUESTIONS}
+NEXT_STEP: Dict[str, Step] = {a.state.state: b for a, b in zip(QUESTIONS, QUESTIONS[1:])}
+TEXT_STATES = [step.state for step in QUESTIONS if step.accepts == "text"]
+CHOICE_STATES = [step.state for step in QUESTIONS if step.accepts == "choice"]
+
+async def ask(message: Message, state: FSMContext, bot: Bot, media: Dict[str, Any], step: Step) -> None:
+    file_id = media.get(step.media) if step.media else None
+    if file_id:
+        if step.accepts == "voice":
+            fire_and_forget(bot.send_voice(chat_id=message.chat.id, voice=file_id))
+        else:
+            fire_and_forget(bot.send_video(chat_id=message.chat.id, video=file_id))
+    else:
+        await bot.send_message(chat_id=message.chat.id, text=step.prompt, reply_markup=step.kb)
+    await state.set_state(step.state)
+
+async def next_step(message: Message, state: FSMContext, bot: Bot, media: Dict[str, Any],
+                    step: Step, value: Any) -> None:
+    # Store the answer to `step`, then ask the following question or submit the form
+    await push_answer(state, step.key, value)
+    following = NEXT_STEP.get(step.state.state)
+    if following:
+        await ask(message, state, bot, media, following)
+    else:
+        await finish_form(message, state, bot)
+
+# ------- Start flow -------
+@router.message(CommandStart())
+async def on_start(message: Message, state: FSMContext, bot: Bot, media: Dict[str, Any]):
+    # Send intro video if set, alongside the job buttons (sending issues are ignored)
+    if media.get("intro_video_file_id"):
+        fire_and_forget(bot.send_video(chat_id=message.chat.id, video=media["intro_video_file_id"]))
+    # Send text with job buttons; a restarted form begins with no answers
+    await state.set_data({})
+    await ask(message, state, bot, media, QUESTIONS[0])
+
+# All inline choices share one handler; the current state picks the step
+@router.callback_query(ChoiceCB.filter(), StateFilter(*CHOICE_STATES))
+async def on_choice(call: CallbackQuery, callback_data: ChoiceCB, state: FSMContext, raw_state: str,
+                    bot: Bot, media: Dict[str, Any]):
+    step = STEPS[raw_state]
+    await call.answer()
+    # A button left over from an earlier question (or from an older keyboard) is ignored
+    if callback_data.q != step.choice or not 0 <= callback_data.idx < len(step.options):
+        return
+    if step.state == Form.ChooseJob:
+        # The pressed message is the job prompt itself: drop its buttons without waiting (video remains)
+        fire_and_forget(bot.edit_message_reply_markup(
+            chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=None))
+    await next_step(call.message, state, bot, media, step, step.options[callback_data.idx])
+
+# Any other button (old callback format, or pressed outside the form) only stops the spinner
+@router.callback_query()
+async def on_stale_button(call: CallbackQuery):
+    await call.answer()
+
+# All free-text questions share one handler; the current state picks the step.
+# raw_state is the state the FSM middleware already loaded, so no extra storage read.
+@router.message(StateFilter(*TEXT_STATES), F.text)
+async def on_text_answer(message: Message, state: FSMContext, raw_state: str, bot: Bot,
+                         media: Dict[str, Any]):
+    step = STEPS[raw_state]
+    text = message.text.strip()
+    if step.validator and not step.validator(text):
+        await message.answer(step.error)
+        return
+    await next_step(message, state, bot, media, step, text)
+
+@router.message(Form.AskPhone, F.contact)
+async def phone_via_contact(message: Message, state: FSMContext, bot: Bot, media: Dict[str, Any]):
+    await next_step(message, state, bot, media, STEPS[Form.AskPhone.state], message.contact.phone_number)
+
+@router.message(Form.WaitVoiceAnswer, F.voice)
+async def on_voice_answer(message: Message, state: FSMContext, bot: Bot, media: Dict[str, Any]):
+    await next_step(message, state, bot, media, STEPS[Form.WaitVoiceAnswer.state], message.voice.file_id)
+
+# If not voice, ignore (bot stays silent by requirement)
+
+@router.message(Form.WaitVideoAnswer, F.video | F.video_note)
+async def on_video_answer(message: Message, state: FSMContext, bot: Bot, media: Dict[str, Any]):
+    file_id = message.video.file_id if message.video else message.video_note.file_id
+    await next_step(message, state, bot, media, STEPS[Form.WaitVideoAnswer.state], file_id)
+
+# If not video, ignore (silent)
+
+# Name and job are shown at the top of the admin summary; the other answers follow
+# in question order
+SUMMARY_HEADER_KEYS = frozenset({"Ism-familiya", "Ish turi"})
+SUMMARY_LABELS = [step.key for step in QUESTIONS if step.key not in SUMMARY_HEADER_KEYS]
+
+async def finish_form(message: Message, state: FSMContext, bot: Bot):
+    answers = await state.get_data()
+    # Compose summary
+    lines = [
+        f"📝 Yangi ariza #{message.from_user.id}",
+        f"F.I.Sh: {answers.get('Ism-familiya','')}",
+        f"Ish turi: {answers.get('Ish turi','')}",
+        *(f"{label}: {answers.get(label, '')}" for label in SUMMARY_LABELS),
+    ]
+    text = "\n".join(lines)
+
+    async def send_to_admin(admin_id: int) -> None:
+        # Отправляем текст анкеты
+        await bot.send_message(chat_id=admin_id, text=text)
+
+        # 🔹 Отправляем голос пользователя, если есть
+        if "Ovozli javob (file_id)" in answers:
+            await bot.send_voice(chat_id=admin_id, voice=answers["Ovozli javob (file_id)"])
+
+        # 🔹 Отправляем видео пользователя, если есть
+        if "Video javob (file_id)" in answers:
+            await bot.send_video(chat_id=admin_id, video=answers["Video javob (file_id)"])
+
+    # Send to all admins at once; each admin still gets text, voice, video in order
+    await asyncio.gather(*(send_to_admin(admin_id) for admin_id in get_admins()), return_exceptions=True)
+
+    await message.answer("Ma'lumotlaringiz qabul qilindi. Tez orada xabarini beramiz!")
+    await state.set_state(Form.Done)
+    await state.clear()
+
+# ------------- Admin commands -------------
+@router.message(Command("set_intro_video"))
+async def set_intro_video(msg: Message, bot: Bot):
+    if not is_admin(msg.from_user.id):
+        return
+    if not msg.reply_to_message or not (msg.reply_to_message.video or msg.reply_to_message.video_note):
+        await msg.answer("Ushbu buyruqni video xabariga javoban yuboring (reply).")
+        return
+    file_id = (msg.reply_to_message.video.file_id if msg.reply_to_message.video 
+               else msg.reply_to_message.video_note.file_id)
+    await update_media("intro_video_file_id", file_id)
+    await msg.answer("Intro video yangilandi. ✅")
+
+@router.message(Command("set_voice_prompt"))
+async def set_voice_prompt(msg: Message):
+    if not is_admin(msg.from_user.id):
+        return
+    if not msg.reply_to_message or not msg.reply_to_message.voice:
+        await msg.answer("Ushbu buyruqni OVOZ xabariga javoban yuboring (reply).")
+        return
+    file_id = msg.reply_to_message.voice.file_id
+    await update_media("voice_prompt_file_id", file_id)
+    await msg.answer("Ovozli savol yangilandi. ✅")
+
+@router.message(Command("set_russian_video"))
+async def set_russian_video(msg: Message):
+    if not is_admin(msg.from_user.id):
+        return
+    if not msg.reply_to_message or not (msg.reply_to_message.video or msg.reply_to_message.video_note):
+        await msg.answer("Ushbu buyruqni video xabariga javoban yuboring (reply).")
+        return
+    file_id = (msg.reply_to_message.video.file_id if msg.reply_to_message.video 
+               else msg.reply_to_message.video_note.file_id)
+    await update_media("russian_video_prompt_file_id", file_id)
+    await msg.answer("Rus tili uchun video savol yangilandi. ✅")
+
+@router.message(Command("add_admin"))
+async def add_admin_cmd(msg: Message):
+    if msg.from_user.id != MAIN_ADMIN:
+        return
+    parts = msg.text.strip().split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        await msg.answer("Foydalanish: /add_admin 123456789")
+        return
+    uid = int(parts[1])
+    await add_admin(uid)
+    await msg.answer(f"Admin qo'shildi: {uid} ✅")
+
+@router.message(Command("remove_admin"))
+async def remove_admin_cmd(msg: Message):
+    if msg.from_user.id != MAIN_ADMIN:
+        return
+    parts = msg.text.strip().split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        await msg.answer("Foydalanish: /remove_admin 123456789")
+        return
+    uid = int(parts[1])
+    if await remove_admin(uid):
+        await msg.answer(f"Admin o'chirildi: {uid} ✅")
+    else:
+        await msg.answer("Bu foydalanuvchini o'chirish mumkin emas.")
+
+@router.message(Command("cancel"))
+async def cancel(msg: Message, state: FSMContext):
+    await state.clear()
+    await msg.answer("Bekor qilindi. /start dan qayta boshlang.", reply_markup=REMOVE_KB)
@@ -0,0 +1,40 @@
+# keyboards.py
+# Callback data factories and the prebuilt (shared) keyboards
+from typing import List
+
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import (InlineKeyboardMarkup, InlineKeyboardButton, KeyboardButton, ReplyKeyboardMarkup,
+                           ReplyKeyboardRemove)
+
+from config import JOB_TYPES
+
+# Callback data carries only the question code and option index; labels are looked up server-side
+class ChoiceCB(CallbackData, prefix="c"):
+    q: str
+    idx: int
+
+JOB_Q, EDU_Q, MARITAL_Q, RUSSIAN_Q, YESNO_Q = "j", "e", "m", "r", "y"
+
+EDUCATION_OPTIONS = ["o'rta", "o'rta maxsus", "oliy"]
+MARITAL_OPTIONS = ["oilaliman", "oilasizman", "ajrashganman"]
+RUSSIAN_OPTIONS = ["a'lo", "yaxshi", "past", "bilmayman"]
+YESNO_OPTIONS = ["ha", "yo'q"]
+
+# Utility keyboards
+def inline_from_list(options: List[str], q: str) -> InlineKeyboardMarkup:
+    # Text and packed callback data are known-good strings, so skip pydantic validation
+    buttons = [[InlineKeyboardButton.model_construct(text=opt, callback_data=ChoiceCB(q=q, idx=i).pack())]
+               for i, opt in enumerate(options)]
+    return InlineKeyboardMarkup.model_construct(inline_keyboard=buttons)
+
+# Option lists are static, so keyboards are built once and shared
+EDUCATION_KB = inline_from_list(EDUCATION_OPTIONS, EDU_Q)
+MARITAL_KB = inline_from_list(MARITAL_OPTIONS, MARITAL_Q)
+RUSSIAN_KB = inline_from_list(RUSSIAN_OPTIONS, RUSSIAN_Q)
+YESNO_KB = inline_from_list(YESNO_OPTIONS, YESNO_Q)
+JOBS_KB = inline_from_list(JOB_TYPES, JOB_Q)
+PHONE_KB = ReplyKeyboardMarkup(
+    keyboard=[[KeyboardButton(text="Telefon raqamni jo'natish", request_contact=True)]],
+    resize_keyboard=True, one_time_keyboard=True
+)
+REMOVE_KB = ReplyKeyboardRemove()
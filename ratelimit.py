@@ -0,0 +1,33 @@
+# ratelimit.py
+# Bot-wide and per-chat limits for outgoing Telegram API calls
+from collections import OrderedDict
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiolimiter import AsyncLimiter
+
+# Telegram allows ~30 messages/sec per bot and ~1/sec per chat (short bursts are tolerated).
+# Leave some headroom on the global bucket so bursts queue here instead of hitting 429s.
+GLOBAL_LIMITER = AsyncLimiter(28, 1.0)
+CHAT_LIMITERS: "OrderedDict[int, AsyncLimiter]" = OrderedDict()
+CHAT_LIMITERS_MAX = 10_000
+
+def chat_limiter(chat_id: int) -> AsyncLimiter:
+    limiter = CHAT_LIMITERS.get(chat_id)
+    if limiter is None:
+        limiter = CHAT_LIMITERS[chat_id] = AsyncLimiter(3, 3.0)
+        if len(CHAT_LIMITERS) > CHAT_LIMITERS_MAX:
+            CHAT_LIMITERS.popitem(last=False)
+    else:
+        CHAT_LIMITERS.move_to_end(chat_id)
+    return limiter
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """Queues every chat-bound API call behind the global and per-chat buckets."""
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+        # Wait for the chat first: a global token is only spent when the request can go out
+        async with chat_limiter(chat_id), GLOBAL_LIMITER:
+            return await make_request(bot, method)
@@ -0,0 +1,29 @@
+# states.py
+# FSM states of the hiring questionnaire
+from aiogram.fsm.state import StatesGroup, State
+
+
+class Form(StatesGroup):
+    ChooseJob = State()
+    AskName = State()
+    AskPhone = State()
+    AskAddress = State()
+    AskBirthday = State()
+    AskEducation = State()
+    AskExperience = State()
+    AskMarital = State()
+    WaitVoiceAnswer = State()
+    AskRussian = State()
+    WaitVideoAnswer = State()
+    AskConsent = State()
+    AskReference = State()
+    AskDuration = State()
+    AskOvertime = State()
+    AskHealth = State()
+    AskWhyLate = State()
+    AskWhySteal = State()
+    AskWhyGoodBad = State()
+    AskPrevSalary = State()
+    AskDesiredSalary = State()
+    AskCourses = State()
+    Done = State()
@@ -0,0 +1,118 @@
+# storage.py
+# Simple JSON storage for media prompts and admins
+import asyncio
+import json
+import os
+try:
+    import orjson  # optional, faster (de)serialization of the storage files
+except ImportError:
+    orjson = None
+from pathlib import Path
+from typing import Any, Dict, FrozenSet
+
+from config import MAIN_ADMIN, STORAGE_DIR
+
+STORAGE = Path(STORAGE_DIR)
+MEDIA_FILE = STORAGE / "media.json"
+ADMINS_FILE = STORAGE / "admins.json"
+
+def load_json(path: Path, default: Any) -> Any:
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return default
+    try:
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    except ValueError:  # JSONDecodeError (json and orjson) / bad encoding
+        return default
+
+def _save_json_sync(path: Path, data: Any) -> None:
+    if orjson:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    # Write to a temp file and swap it in, so readers never see a partial file.
+    # The temp file is created like open(path, "w") would (0666 minus the umask);
+    # an existing file keeps its own mode.
+    tmp = path.with_name(f".{path.name}.{os.urandom(4).hex()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+_SAVE_LOCK = asyncio.Lock()
+
+async def save_json(path: Path, data: Any) -> None:
+    # Run the write off the event loop; the lock keeps writes in call order
+    async with _SAVE_LOCK:
+        await asyncio.to_thread(_save_json_sync, path, data)
+
+def ensure_storage() -> None:
+    # Ensure storage dir and files exist; called once from main()
+    STORAGE.mkdir(parents=True, exist_ok=True)
+    if not MEDIA_FILE.exists():
+        _save_json_sync(MEDIA_FILE, {
+            "intro_video_file_id": None,
+            "voice_prompt_file_id": None,
+            "russian_video_prompt_file_id": None
+        })
+    if not ADMINS_FILE.exists():
+        _save_json_sync(ADMINS_FILE, {"admins": [MAIN_ADMIN]})
+
+# media.json is loaded once at startup; update_media() keeps this dict and the file in sync
+MEDIA: Dict[str, Any] = {}
+
+def load_media() -> None:
+    data = load_json(MEDIA_FILE, {})
+    # Guarantee keys
+    for key in ["intro_video_file_id", "voice_prompt_file_id", "russian_video_prompt_file_id"]:
+        data.setdefault(key, None)
+    MEDIA.clear()
+    MEDIA.update(data)
+
+def get_media() -> Dict[str, Any]:
+    return MEDIA
+
+async def update_media(key: str, file_id: str) -> None:
+    MEDIA[key] = file_id
+    await save_json(MEDIA_FILE, dict(MEDIA))
+
+# Admins are loaded once at startup; admins.json is only written when the roster changes.
+# The roster is an immutable snapshot that is swapped on change, so a broadcast loop
+# iterating it can't be disturbed by a concurrent /add_admin.
+_ADMINS_SET: FrozenSet[int] = frozenset()
+
+def load_admins() -> None:
+    global _ADMINS_SET
+    data = load_json(ADMINS_FILE, {"admins": [MAIN_ADMIN]})
+    _ADMINS_SET = frozenset(data["admins"]) | {MAIN_ADMIN}
+
+def get_admins() -> FrozenSet[int]:
+    return _ADMINS_SET
+
+def is_admin(user_id: int) -> bool:
+    return user_id in _ADMINS_SET
+
+async def _set_admins(admins: FrozenSet[int]) -> None:
+    global _ADMINS_SET
+    _ADMINS_SET = admins
+    await save_json(ADMINS_FILE, {"admins": sorted(admins)})
+
+async def add_admin(user_id: int) -> None:
+    if user_id not in _ADMINS_SET:
+        await _set_admins(_ADMINS_SET | {user_id})
+
+async def remove_admin(user_id: int) -> bool:
+    if user_id not in _ADMINS_SET or user_id == MAIN_ADMIN:
+        return False
+    await _set_admins(_ADMINS_SET - {user_id})
+    return True
@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiolimiter import AsyncLimiter
+
+import ratelimit
+
+
+def test_global_rate_holds_under_per_chat_backpressure(monkeypatch):
+    monkeypatch.setattr(ratelimit, "CHAT_LIMITERS", type(ratelimit.CHAT_LIMITERS)())
+    sent = []
+
+    async def make_request(bot, method):
+        sent.append(asyncio.get_running_loop().time())
+
+    async def scenario():
+        monkeypatch.setattr(ratelimit, "GLOBAL_LIMITER", AsyncLimiter(28, 1.0))
+        middleware = ratelimit.RateLimitMiddleware()
+
+        def send(chat_id):
+            return middleware(make_request, None, SimpleNamespace(chat_id=chat_id))
+
+        # 28 chats have just used up their burst, so their next message has to wait
+        for chat_id in range(28):
+            for _ in range(3):
+                await ratelimit.chat_limiter(chat_id).acquire()
+        waiting = [asyncio.create_task(send(chat_id)) for chat_id in range(28)]
+        await asyncio.sleep(0.9)
+        # ...while 28 fresh chats start sending
+        await asyncio.gather(*(send(chat_id) for chat_id in range(100, 128)), *waiting)
+
+    asyncio.run(scenario())
+
+    assert len(sent) == 56
+    # Leaky bucket envelope: any run of sends fits in capacity + rate * elapsed (+ timer slack)
+    for i in range(len(sent)):
+        for j in range(i, len(sent)):
+            assert j - i + 1 <= 28 + 28 * (sent[j] - sent[i]) + 2
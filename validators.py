@@ -0,0 +1,20 @@
+# validators.py
+# Answer validators used by the question table.
+# They receive the answer text already stripped by the text handler.
+import re
+from datetime import datetime
+
+# ASCII digits only, as strptime("%d.%m.%Y") accepted
+DATE_RE = re.compile(r"(\d{2})\.(\d{2})\.(\d{4})", re.ASCII)
+
+def valid_date(s: str) -> bool:
+    m = DATE_RE.fullmatch(s)
+    if not m:
+        return False
+    # The regex already split out the fields; datetime() only has to reject e.g. 31.02
+    day, month, year = m.groups()
+    try:
+        datetime(int(year), int(month), int(day))
+        return True
+    except ValueError:
+        return False